@@ -1,5 +1,5 @@
-import asyncio
 import os
+import sys
 from google import genai
 from google.genai.types import LiveConnectConfig, Modality, Content, Part
 from dotenv import load_dotenv
@@ -30,17 +30,32 @@ async def main():
             )
 
             print("Model: ", end="", flush=True)
+            # Buffer text fragments and flush on word/sentence boundaries
+            text_buf = []
             async for chunk in session.receive():
-                if chunk.server_content and chunk.server_content.model_turn:
-                    for part in chunk.server_content.model_turn.parts:
+                if (sc := chunk.server_content) and sc.model_turn:
+                    for part in sc.model_turn.parts:
                         if part.text:
-                            print(part.text, end="", flush=True)
-            print()
+                            text_buf.append(part.text)
+                            if len(text_buf) >= 8 or part.text.endswith(("\n", " ", ".", "!", "?")):
+                                sys.stdout.write("".join(text_buf))
+                                sys.stdout.flush()
+                                text_buf.clear()
+            print("".join(text_buf))
     except Exception as e:
         print(f"Error during interaction: {e}")
 
 if __name__ == "__main__":
+    # Prefer a libuv-based event loop when one is installed
     try:
-        asyncio.run(main())
+        if sys.platform == "win32":
+            from winloop import run
+        else:
+            from uvloop import run
+    except ImportError:
+        from asyncio import run
+
+    try:
+        run(main())
     except KeyboardInterrupt:
         print("\nProgram stopped.")
\ No newline at end of file
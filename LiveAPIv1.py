@@ -1,12 +1,9 @@
 import asyncio
 import os
-import io
-import wave
+import sys
 from google import genai
 from google.genai.types import LiveConnectConfig, Modality, Content, Part, Blob
 from dotenv import load_dotenv
-import soundfile as sf
-import librosa
 
 load_dotenv()
 
@@ -20,6 +17,7 @@ model_text = "gemini-2.0-flash-live-001"
 model_audio = "gemini-2.5-flash-native-audio-preview-09-2025"
 model_audio_timeout = 10.0  # seconds
 audio_input_sr = 16000  # sample rate for audio recording
+audio_input_mime = f"audio/pcm;rate={audio_input_sr}"  # MIME type for audio sent to the model
 audio_output_sr = 24000  # sample rate for audio playback
 output_audio_file = "response_audio.wav"  # output file name for audio response
 
@@ -34,6 +32,49 @@ config_audio = LiveConnectConfig(
     system_instruction="You are a helpful assistant and answer in a friendly tone.",
 )
 
+def resample_to_16k(audio_path):
+    """Loads an audio file as mono PCM 16-bit samples at 16kHz."""
+    # Audio libraries are imported lazily so text mode starts quickly
+    import numpy as np
+    import soundfile as sf
+    import soxr
+
+    # Read audio as float samples and downmix to mono if needed
+    y, sr = sf.read(audio_path, dtype='float32', always_2d=False)
+    if y.ndim > 1:
+        y = y.mean(axis=1)
+
+    # Use soxr to convert audio to 16kHz; common rates like 48kHz, 44.1kHz
+    # and 8kHz are small integer ratios, which soxr handles with a polyphase filter
+    if sr != 16000:
+        y = soxr.resample(y, sr, 16000, quality='HQ')
+
+    # Convert to PCM 16-bit in memory
+    y = np.ascontiguousarray(y, dtype=np.float32)
+    return (np.clip(y, -1.0, 1.0) * 32767.0).astype(np.int16)
+
+async def stream_audio(session, timeout):
+    """Yields response audio data, waiting at most `timeout` seconds for the first chunk."""
+    receiver = session.receive().__aiter__()
+    next_chunk = receiver.__anext__
+
+    # Stage 1: Timeout only if NO response received
+    try:
+        chunk = await asyncio.wait_for(next_chunk(), timeout=timeout)
+    except StopAsyncIteration:
+        return
+
+    # Stage 2: Once response started, read all remaining data without timeout
+    while True:
+        if (sc := chunk.server_content) and sc.model_turn:
+            for part in sc.model_turn.parts:
+                if part.inline_data:
+                    yield part.inline_data.data
+        try:
+            chunk = await next_chunk()
+        except StopAsyncIteration:
+            return
+
 async def main():
     print("Choose input type:")
     print("1: Audio")
@@ -49,63 +90,39 @@ async def main():
 
             async with client.aio.live.connect(model=model_audio, config=config_audio) as session:
                 print("Processing audio...")
-                # Use librosa to load and convert audio to 16kHz
-                y, sr = librosa.load(audio_path, sr=16000)
-
-                # Write to buffer as PCM 16-bit
-                buffer = io.BytesIO()
-                sf.write(buffer, y, sr, format='RAW', subtype='PCM_16')
-                buffer.seek(0)
-                audio_bytes = buffer.read()
+                audio_bytes = resample_to_16k(audio_path).tobytes()
 
                 # Send processed audio using send_realtime_input
                 await session.send_realtime_input(
-                    audio=Blob(mime_type="audio/pcm;rate=16000", data=audio_bytes)
+                    audio=Blob(mime_type=audio_input_mime, data=audio_bytes)
                 )
 
                 print("Receiving audio response and saving to file...")
                 
-                # Collect audio chunks with timeout
-                audio_chunks = []
+                # Accumulate audio data with timeout
+                audio_buf = bytearray()
                 timed_out = False
                 
                 try:
-                    receiver = session.receive().__aiter__()
-                    
-                    # Stage 1: Timeout only if NO response received
-                    first_chunk = await asyncio.wait_for(
-                        receiver.__anext__(),
-                        timeout=model_audio_timeout
-                    )
-                    if first_chunk.server_content and first_chunk.server_content.model_turn:
-                        for part in first_chunk.server_content.model_turn.parts:
-                            if part.inline_data:
-                                audio_chunks.append(part.inline_data.data)
-                    
-                    # Stage 2: Once response started, read all remaining data
-                    while True:
-                        try:
-                            chunk = await receiver.__anext__()
-                        except StopAsyncIteration:
-                            break
-                        if chunk.server_content and chunk.server_content.model_turn:
-                            for part in chunk.server_content.model_turn.parts:
-                                if part.inline_data:
-                                    audio_chunks.append(part.inline_data.data)
-                
+                    async for data in stream_audio(session, model_audio_timeout):
+                        audio_buf.extend(data)
+
                 except asyncio.TimeoutError:
                     print(f"⚠️  Model did not provide any response within {model_audio_timeout} seconds.")
                     timed_out = True
                 
                 # Write to file if audio data was received
-                if audio_chunks and not timed_out:
+                if audio_buf and not timed_out:
+                    import wave
                     with wave.open(output_audio_file, "wb") as wf:
                         wf.setnchannels(1)
                         wf.setsampwidth(2)
                         wf.setframerate(audio_output_sr)
-                        wf.writeframes(b"".join(audio_chunks))
+                        # Size the header up front so the file is written in one pass
+                        wf.setnframes(len(audio_buf) // 2)
+                        wf.writeframesraw(audio_buf)
                     print(f"✔ Audio response saved to file: {output_audio_file}")
-                elif not audio_chunks and not timed_out:
+                elif not audio_buf and not timed_out:
                     print("ℹ️  No audio data was received in the response.")
         except Exception as e:
             print(f"Error during audio processing: {e}")
@@ -121,12 +138,18 @@ async def main():
                 )
 
                 print("Model: ", end="", flush=True)
+                # Buffer text fragments and flush on word/sentence boundaries
+                text_buf = []
                 async for chunk in session.receive():
-                    if chunk.server_content and chunk.server_content.model_turn:
-                        for part in chunk.server_content.model_turn.parts:
+                    if (sc := chunk.server_content) and sc.model_turn:
+                        for part in sc.model_turn.parts:
                             if part.text:
-                                print(part.text, end="", flush=True)
-                print()
+                                text_buf.append(part.text)
+                                if len(text_buf) >= 8 or part.text.endswith(("\n", " ", ".", "!", "?")):
+                                    sys.stdout.write("".join(text_buf))
+                                    sys.stdout.flush()
+                                    text_buf.clear()
+                print("".join(text_buf))
         except Exception as e:
             print(f"Error during text interaction: {e}")
 
@@ -134,8 +157,17 @@ async def main():
         print("Invalid choice. Please run the program again.")
 
 if __name__ == "__main__":
+    # Prefer a libuv-based event loop when one is installed
+    try:
+        if sys.platform == "win32":
+            from winloop import run
+        else:
+            from uvloop import run
+    except ImportError:
+        from asyncio import run
+
     try:
-        asyncio.run(main())
+        run(main())
     except KeyboardInterrupt:
         print("\nProgram stopped.")
     except Exception as e:
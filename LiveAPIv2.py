@@ -1,11 +1,11 @@
 import asyncio
 import os
-import wave
-import numpy as np
+import sys
+import threading
+from collections import deque
 from google import genai
 from google.genai.types import LiveConnectConfig, Modality, Content, Part, Blob
 from dotenv import load_dotenv
-import sounddevice as sd
 
 # ==================================================================
 #                       GLOBAL CONFIGURATION
@@ -16,7 +16,10 @@ model_audio = "gemini-2.5-flash-native-audio-preview-09-2025"
 model_audio_timeout = 10.0  # seconds
 mic_test_duration = 3.0  # seconds for microphone test
 audio_input_sr = 16000  # sample rate for audio recording
+audio_input_mime = f"audio/pcm;rate={audio_input_sr}"  # MIME type for audio sent to the model
 audio_output_sr = 24000  # sample rate for audio playback
+audio_block_ms = 100  # milliseconds of audio sent per request
+audio_pool_size = 32  # number of preallocated microphone blocks
 output_audio_file = "response_audio.wav"  # output file name for audio response
 
 # Load environment variables
@@ -38,6 +41,38 @@ config_audio = LiveConnectConfig(
     system_instruction="You are a helpful assistant and answer in a friendly tone.",
 )
 
+# ==================================================================
+#                       CONSOLE INPUT
+# ==================================================================
+
+async def async_input(prompt=""):
+    """Reads a line from stdin without blocking the event loop."""
+    # The event loop can only watch stdin on POSIX, and only a terminal is safe:
+    # in canonical mode each read returns a single line, so sys.stdin never
+    # buffers a line ahead of fd readiness. Windows event loops and piped or
+    # redirected stdin fall back to reading in a worker thread
+    if sys.platform == "win32" or not sys.stdin.isatty():
+        return await asyncio.to_thread(input, prompt)
+
+    loop = asyncio.get_running_loop()
+    future = loop.create_future()
+    fd = sys.stdin.fileno()
+
+    def on_readable():
+        loop.remove_reader(fd)
+        if not future.done():
+            future.set_result(sys.stdin.readline())
+
+    print(prompt, end="", flush=True)
+    loop.add_reader(fd, on_readable)
+    try:
+        line = await future
+    finally:
+        loop.remove_reader(fd)
+    if not line:
+        raise EOFError
+    return line.rstrip("\n")
+
 # ==================================================================
 #                       TEXT INTERACTION
 # ==================================================================
@@ -54,12 +89,18 @@ async def text_interaction():
             )
 
             print("Model: ", end="", flush=True)
+            # Buffer text fragments and flush on word/sentence boundaries
+            text_buf = []
             async for chunk in session.receive():
-                if chunk.server_content and chunk.server_content.model_turn:
-                    for part in chunk.server_content.model_turn.parts:
+                if (sc := chunk.server_content) and sc.model_turn:
+                    for part in sc.model_turn.parts:
                         if part.text:
-                            print(part.text, end="", flush=True)
-            print()
+                            text_buf.append(part.text)
+                            if len(text_buf) >= 8 or part.text.endswith(("\n", " ", ".", "!", "?")):
+                                sys.stdout.write("".join(text_buf))
+                                sys.stdout.flush()
+                                text_buf.clear()
+            print("".join(text_buf))
     except Exception as e:
         print(f"Error during text interaction: {e}")
 
@@ -70,11 +111,13 @@ async def text_interaction():
 def test_microphone():
     """Records a short audio clip to test the microphone."""
     try:
+        import sounddevice as sd
+
         print(f"Starting recording for {mic_test_duration} seconds...")
         recording = sd.rec(int(mic_test_duration * audio_input_sr),
                            samplerate=audio_input_sr,
                            channels=1,
-                           dtype='float32')
+                           dtype='int16')
         sd.wait()
 
         print("Recording finished. Playing back for verification...")
@@ -89,117 +132,172 @@ def test_microphone():
 #              REAL-TIME AUDIO INTERACTION
 # ==================================================================
 
+async def stream_audio(session, timeout):
+    """Yields response audio data, waiting at most `timeout` seconds for the first chunk."""
+    receiver = session.receive().__aiter__()
+    next_chunk = receiver.__anext__
+
+    # Stage 1: Timeout only if NO response received
+    try:
+        chunk = await asyncio.wait_for(next_chunk(), timeout=timeout)
+    except StopAsyncIteration:
+        return
+
+    # Stage 2: Once response started, read all remaining data without timeout
+    while True:
+        if (sc := chunk.server_content) and sc.model_turn:
+            for part in sc.model_turn.parts:
+                if part.inline_data:
+                    yield part.inline_data.data
+        try:
+            chunk = await next_chunk()
+        except StopAsyncIteration:
+            return
+
 async def real_time_audio_interaction():
     """Handles real-time audio interaction."""
+    # Audio libraries are imported lazily so text mode starts quickly
+    import wave
+    import numpy as np
+    import sounddevice as sd
+    import soxr
 
     async with client.aio.live.connect(model=model_audio, config=config_audio) as session:
         print("\n🎤 Starting real-time audio session...")
         print(">> Type 'quit' or 'exit' to end the session.")
 
-        while True:
-            queue: asyncio.Queue[np.ndarray] = asyncio.Queue()
-
-            # Task to wait for the user to press Enter to stop recording
-            user_input_task = asyncio.create_task(
-                asyncio.to_thread(
-                    input,
-                    ">> Press Enter to stop recording, type 'quit' or 'exit' to end the session.\n"
-                )
-            )
-
-            loop = asyncio.get_running_loop()
-
-            # The sounddevice callback runs in a separate thread
-            def audio_callback(indata, frames, time, status):
-                if status:
-                    print(status)
-                loop.call_soon_threadsafe(queue.put_nowait, indata.copy())
-
-            # Task to send audio from the queue to the API
-            async def sender_task():
-                while True:
-                    try:
-                        indata = await asyncio.wait_for(queue.get(), timeout=0.1)
-                        if indata is None:
-                            break
-                        await session.send_realtime_input(
-                            audio=Blob(
-                                mime_type=f"audio/pcm;rate={audio_input_sr}",
-                                data=indata.tobytes()
+        # Record at the device's native rate and resample off the audio thread
+        native_sr = int(sd.query_devices(kind='input')['default_samplerate'])
+        block_size = native_sr * audio_block_ms // 1000
+
+        # The input stream, queue and sender live for the whole session;
+        # recording is toggled per turn with recording_on, and stop_requested
+        # asks the audio callback to post the end-of-turn sentinel
+        queue: asyncio.Queue[int] = asyncio.Queue()
+        recording_on = threading.Event()
+        stop_requested = threading.Event()
+        turn_flushed = asyncio.Event()
+
+        # Preallocated microphone blocks; the queue carries pool indices
+        pool = [np.empty(block_size, dtype=np.int16) for _ in range(audio_pool_size)]
+        free_blocks = deque(range(audio_pool_size))
+
+        # Stateful resampler keeps filter history across blocks
+        resampler = None
+        if native_sr != audio_input_sr:
+            resampler = soxr.ResampleStream(native_sr, audio_input_sr, 1, dtype='int16')
+
+        loop = asyncio.get_running_loop()
+
+        # The sounddevice callback runs in a separate thread
+        def audio_callback(indata, frames, time, status):
+            if status:
+                print(status)
+            if stop_requested.is_set():
+                # Posting the sentinel from this thread orders it after the last block
+                stop_requested.clear()
+                loop.call_soon_threadsafe(queue.put_nowait, None)
+                return
+            if not recording_on.is_set():
+                return
+            if not free_blocks:
+                return  # Sender is falling behind, drop this block
+            i = free_blocks.popleft()
+            np.copyto(pool[i], indata[:, 0])
+            loop.call_soon_threadsafe(queue.put_nowait, i)
+
+        # Task to send audio from the queue to the API
+        async def sender_task():
+            while True:
+                i = await queue.get()
+                if i is None:  # Posted once the user stops recording
+                    if resampler:
+                        # Flush the samples still held in the resampler's filter
+                        tail = resampler.resample_chunk(np.empty(0, dtype=np.int16), last=True)
+                        resampler.clear()
+                        if tail.size:
+                            await session.send_realtime_input(
+                                audio=Blob(
+                                    mime_type=audio_input_mime,
+                                    data=tail.tobytes()
+                                )
                             )
-                        )
-                    except asyncio.TimeoutError:
-                        # If user pressed Enter, stop sending
-                        if user_input_task.done():
-                            break
-
-            sender = asyncio.create_task(sender_task())
-
-            # Start recording from the microphone
-            with sd.InputStream(
-                samplerate=audio_input_sr,
-                channels=1,
-                dtype='int16',
-                callback=audio_callback
-            ):
-                user_input = await user_input_task  # Wait for Enter to stop
-
-            if user_input.lower() in ["quit", "exit"]:
-                print("Ending audio session.")
-                # Stop sender and exit loop
-                await queue.put(None)
-                await sender
-                break
-
-            # Stop the sender_task
-            await queue.put(None)
-            await sender
-
-            print("⏳ Recording stopped. Receiving response from model...")
-
-            # Collect audio chunks in memory before writing to a file.
-            audio_chunks = []
-            timed_out = False
-
-            try:
-                receiver = session.receive().__aiter__()
-
-                # Stage 1: Timeout only if NO response received
-                first_chunk = await asyncio.wait_for(
-                    receiver.__anext__(),
-                    timeout=model_audio_timeout
+                    turn_flushed.set()
+                    continue
+                block = pool[i]
+                data = (resampler.resample_chunk(block) if resampler else block).tobytes()
+                free_blocks.append(i)
+                await session.send_realtime_input(
+                    audio=Blob(
+                        mime_type=audio_input_mime,
+                        data=data
+                    )
                 )
-                if first_chunk.server_content and first_chunk.server_content.model_turn:
-                    for part in first_chunk.server_content.model_turn.parts:
-                        if part.inline_data:
-                            audio_chunks.append(part.inline_data.data)
-
-                # Stage 2: Once response started, read all remaining data without timeout
-                while True:
-                    try:
-                        chunk = await receiver.__anext__()
-                    except StopAsyncIteration:
-                        break
-                    if chunk.server_content and chunk.server_content.model_turn:
-                        for part in chunk.server_content.model_turn.parts:
-                            if part.inline_data:
-                                audio_chunks.append(part.inline_data.data)
-
-            except asyncio.TimeoutError:
-                # No response at all within timeout
-                print(f"⚠️  Model did not provide any response within {model_audio_timeout} seconds.")
-                timed_out = True
-
-            # Only write the file if audio data was actually received.
-            if audio_chunks and not timed_out:
-                with wave.open(output_audio_file, "wb") as wf:
-                    wf.setnchannels(1)
-                    wf.setsampwidth(2)
-                    wf.setframerate(audio_output_sr)
-                    wf.writeframes(b"".join(audio_chunks))
-                print(f"✔ Audio response saved to file: {output_audio_file}")
-            elif not audio_chunks and not timed_out:
-                print("ℹ️  No audio data was received in the response.")
+
+        async def stop_recording():
+            """Stops recording and waits until the recorded audio has been sent."""
+            turn_flushed.clear()
+            recording_on.clear()
+            stop_requested.set()
+            flushed = asyncio.create_task(turn_flushed.wait())
+            await asyncio.wait({flushed, sender}, return_when=asyncio.FIRST_COMPLETED)
+            if sender.done():
+                flushed.cancel()
+                sender.result()  # Re-raise errors from sending audio
+
+        stream = sd.InputStream(
+            samplerate=native_sr,
+            channels=1,
+            dtype='int16',
+            blocksize=block_size,
+            callback=audio_callback
+        )
+        sender = asyncio.create_task(sender_task())
+        stream.start()
+
+        try:
+            while True:
+                # Record from the microphone until the user presses Enter
+                recording_on.set()
+                user_input = await async_input(
+                    ">> Press Enter to stop recording, type 'quit' or 'exit' to end the session.\n"
+                )  # Wait for Enter to stop
+                await stop_recording()
+
+                if user_input.lower() in ["quit", "exit"]:
+                    print("Ending audio session.")
+                    break
+
+                print("⏳ Recording stopped. Receiving response from model...")
+
+                # Accumulate audio data in memory before writing to a file.
+                audio_buf = bytearray()
+                timed_out = False
+
+                try:
+                    async for data in stream_audio(session, model_audio_timeout):
+                        audio_buf.extend(data)
+
+                except asyncio.TimeoutError:
+                    # No response at all within timeout
+                    print(f"⚠️  Model did not provide any response within {model_audio_timeout} seconds.")
+                    timed_out = True
+
+                # Only write the file if audio data was actually received.
+                if audio_buf and not timed_out:
+                    with wave.open(output_audio_file, "wb") as wf:
+                        wf.setnchannels(1)
+                        wf.setsampwidth(2)
+                        wf.setframerate(audio_output_sr)
+                        # Size the header up front so the file is written in one pass
+                        wf.setnframes(len(audio_buf) // 2)
+                        wf.writeframesraw(audio_buf)
+                    print(f"✔ Audio response saved to file: {output_audio_file}")
+                elif not audio_buf and not timed_out:
+                    print("ℹ️  No audio data was received in the response.")
+        finally:
+            sender.cancel()
+            stream.close()
 
 # ==================================================================
 #                       MAIN MENU
@@ -227,7 +325,16 @@ async def main():
             print("Invalid option!")
 
 if __name__ == "__main__":
+    # Prefer a libuv-based event loop when one is installed
+    try:
+        if sys.platform == "win32":
+            from winloop import run
+        else:
+            from uvloop import run
+    except ImportError:
+        from asyncio import run
+
     try:
-        asyncio.run(main())
+        run(main())
     except KeyboardInterrupt:
         print("\nProgram stopped.")
\ No newline at end of file